@@ -1,6 +1,21 @@
-import itertools
 import random
-import copy
+
+
+def _neighbor_cells(cell, height, width):
+    """
+    Returns the cells within one row and column of a given cell
+    that lie on a height x width board, not including the cell itself.
+    """
+    i, j = cell
+    return frozenset(
+        (i + di, j + dj)
+        for di in (-1, 0, 1)
+        for dj in (-1, 0, 1)
+        if (di, dj) != (0, 0)
+        and 0 <= i + di < height
+        and 0 <= j + dj < width
+    )
+
 
 class Minesweeper():
     """
@@ -14,24 +29,35 @@ class Minesweeper():
         self.width = width
         self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
+        # Initialize an empty field with no mines, one bit per cell
+        self.board = 0
+
+        # Precompute, for every cell, the bitmask of its neighbors
+        masks = []
         for i in range(self.height):
-            row = []
             for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+                mask = 0
+                for ni, nj in _neighbor_cells((i, j), height, width):
+                    mask |= 1 << (ni * self.width + nj)
+                masks.append(mask)
+
+        # Add mines randomly, drawing distinct cells in a single pass
+        for k in random.sample(range(height * width), mines):
+            self.mines.add(divmod(k, width))
+            self.board |= 1 << k
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Mines never move, so count every cell's nearby mines once
+        self._counts = tuple(
+            (self.board & mask).bit_count() for mask in masks
+        )
 
         # At first, player has found no mines
-        self.mines_found = set()
+        self._mines_found = set()
+
+        # Count flagged cells that really are mines, so won() is O(1)
+        self._mine_count = len(self.mines)
+        self._correct_found = 0
+        self._won = self._mine_count == 0
 
     def print(self):
         """
@@ -40,8 +66,9 @@ class Minesweeper():
         """
         for i in range(self.height):
             print("--" * self.width + "-")
+            row = self.board >> (i * self.width)
             for j in range(self.width):
-                if self.board[i][j]:
+                if (row >> j) & 1:
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -50,7 +77,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool((self.board >> (i * self.width + j)) & 1)
 
     def nearby_mines(self, cell):
         """
@@ -58,30 +85,61 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
+        i, j = cell
+        return self._counts[i * self.width + j]
+
+    @property
+    def mines_found(self):
+        """
+        Set of cells the player has flagged as mines.
+        Use mark_found and unmark_found to change it.
+        """
+        return frozenset(self._mines_found)
 
-        # Keep count of nearby mines
-        count = 0
+    def is_found(self, cell):
+        """
+        Checks if the player has flagged a cell as a mine.
+        """
+        return cell in self._mines_found
 
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
+    def found_count(self):
+        """
+        Returns the number of cells the player has flagged as mines.
+        """
+        return len(self._mines_found)
 
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
+    def mark_found(self, cell):
+        """
+        Records that the player has flagged a cell as a mine.
+        """
+        if cell not in self._mines_found:
+            self._mines_found.add(cell)
+            if cell in self.mines:
+                self._correct_found += 1
+            self._update_won()
 
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+    def unmark_found(self, cell):
+        """
+        Records that the player has removed the flag from a cell.
+        """
+        if cell in self._mines_found:
+            self._mines_found.remove(cell)
+            if cell in self.mines:
+                self._correct_found -= 1
+            self._update_won()
 
-        return count
+    def _update_won(self):
+        """
+        Recomputes whether exactly the mines have been flagged.
+        """
+        self._won = (self._correct_found == self._mine_count
+                     and len(self._mines_found) == self._mine_count)
 
     def won(self):
         """
         Checks if all mines have been flagged.
         """
-        return self.mines_found == self.mines
+        return self._won
 
 
 class Sentence():
@@ -94,6 +152,7 @@ class Sentence():
     def __init__(self, cells, count):
         self.cells = set(cells)
         self.count = count
+        self._resolve()
 
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
@@ -105,16 +164,28 @@ class Sentence():
         """
         Returns the set of all cells in self.cells known to be mines.
         """
-        if self.count == len(self.set):
+        if self._resolved == 'mine':
             return self.cells
 
     def known_safes(self):
         """
         Returns the set of all cells in self.cells known to be safe.
         """
-        if self.count == 0:
+        if self._resolved == 'safe':
             return self.cells
 
+    def _resolve(self):
+        """
+        Caches whether all cells in self.cells are known to be
+        safe ('safe'), known to be mines ('mine'), or neither (None).
+        """
+        if self.count == 0:
+            self._resolved = 'safe'
+        elif self.count == len(self.cells):
+            self._resolved = 'mine'
+        else:
+            self._resolved = None
+
     def mark_mine(self, cell):
         """
         Updates internal knowledge representation given the fact that
@@ -123,6 +194,7 @@ class Sentence():
         if cell in self.cells:
             self.cells.remove(cell)
             self.count -= 1
+            self._resolve()
 
     def mark_safe(self, cell):
         """
@@ -131,6 +203,7 @@ class Sentence():
         """
         if cell in self.cells:
             self.cells.remove(cell)
+            self._resolve()
 
 class MinesweeperAI():
     """
@@ -149,8 +222,29 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Known safe cells that have not been clicked on yet
+        self._pending_safes = set()
+
+        # Cells neither clicked on nor known to be mines
+        self._unchecked = {(i, j) for i in range(height) for j in range(width)}
+
+        # Sentences about the game known to be true, as cells -> count
+        self._knowledge = {}
+
+        # Neighbors of every cell, computed once for the whole board
+        self._neighbors = {
+            (i, j): _neighbor_cells((i, j), height, width)
+            for i in range(height)
+            for j in range(width)
+        }
+
+    @property
+    def knowledge(self):
+        """
+        List of sentences about the game known to be true.
+        """
+        return [Sentence(cells, count)
+                for cells, count in self._knowledge.items()]
 
     def mark_mine(self, cell):
         """
@@ -158,8 +252,15 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self._unchecked.discard(cell)
+        knowledge = {}
+        for cells, count in self._knowledge.items():
+            if cell in cells:
+                cells = cells - {cell}
+                count -= 1
+            if cells:
+                knowledge.setdefault(cells, count)
+        self._knowledge = knowledge
 
     def mark_safe(self, cell):
         """
@@ -167,8 +268,15 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if cell not in self.moves_made:
+            self._pending_safes.add(cell)
+        knowledge = {}
+        for cells, count in self._knowledge.items():
+            if cell in cells:
+                cells = cells - {cell}
+            if cells:
+                knowledge.setdefault(cells, count)
+        self._knowledge = knowledge
 
     def add_knowledge(self, cell, count):
         """
@@ -186,114 +294,60 @@ class MinesweeperAI():
                if they can be inferred from existing knowledge
         """
         self.moves_made.add(cell) # mark the cell as a move that has been made
+        self._pending_safes.discard(cell)
+        self._unchecked.discard(cell)
         self.mark_safe(cell)        # mark the cell as safe
-        # updates sentences that contain cell
-
-        # removing empty knowledge
-        for sent in self.knowledge:
-            if len(sent.cells) == 0:
-                self.knowledge.remove(sent)
-        
-        # removing safes and mines from knowledge
-        for sent in self.knowledge:
-            for safe in self.safes:
-                if safe in sent.cells.copy():
-#                    print(f'removing new safe {safe} from {sent.cells} = {sent.count}\n')
-                    sent.cells.difference_update({safe})        
-            for mine in self.mines:
-                if mine in sent.cells.copy():
-#                    print(f'removing new mine {mine} from {sent.cells} = {sent.count}\n')
-                    sent.cells.difference_update({mine})
-                    sent.count -= 1        
 
         # add a new sentence to the AI's knowledge
-        neighbors = []
-        if cell[0] == 0:
-            if cell[1] == 0: #(0,0) corner
-                for n1 in range(0,2):
-                    for n2 in range(0,2):
-                        neighbors.append((cell[0]+n1,cell[1]+n2))
-            elif cell[1] == self.width-1: #(0,7) corner
-                for n1 in range(0,2):
-                    for n2 in range(-1,1):
-                        neighbors.append((cell[0]+n1,cell[1]+n2))
-            else:# (0,j) row
-                for n1 in range(0,2):
-                    for n2 in range(-1,2):
-                        neighbors.append((cell[0]+n1,cell[1]+n2))
-        elif cell[0] == self.height-1:
-            if cell[1] == 0:#(7,0) corner
-                for n1 in range(-1,1):
-                    for n2 in range(0,2):
-                        neighbors.append((cell[0]+n1,cell[1]+n2))
-            elif cell[1] == self.width-1:#(7,7) corner
-                for n1 in range(-1,1):
-                    for n2 in range(-1,1):
-                        neighbors.append((cell[0]+n1,cell[1]+n2))
-            else:#(7,j) row
-                for n1 in range(-1,1):
-                    for n2 in range(-1,2):
-                        neighbors.append((cell[0]+n1,cell[1]+n2))
-        elif (cell[1] == 0) and (cell[0]>0) and (cell[0]<self.width-1):#(i,0) column
-             for n1 in range(-1,2):
-                for n2 in range(0,2):
-                    neighbors.append((cell[0]+n1,cell[1]+n2))
-        elif (cell[1] == self.height-1) and (cell[0]>0) and (cell[0]<self.width-1):#(i,7) column
-             for n1 in range(-1,2):
-                for n2 in range(-1,1):
-                    neighbors.append((cell[0]+n1,cell[1]+n2))
-        else:
-            for n1 in range(-1,2):
-                for n2 in range(-1,2):
-                    neighbors.append((cell[0]+n1,cell[1]+n2))
-        # remove safes from neighbors
-        aux = copy.deepcopy(self.safes)
-        for neigh in neighbors:
-            if neigh in self.safes:
-                neighbors.remove(neigh)
-            elif neigh in self.mines:
-                if count > 0:
-                    count -= 1 
-                    neighbors.remove(neigh)
-                #else:
-                    #print('Warning: negative count!')
-        self.knowledge.append(Sentence(neighbors,count))
-#        print(f'adding knowledge: {self.knowledge[-1].cells}={self.knowledge[-1].count}')
-    
-        # mark any additional cells as safe
-        # {A,B}=0 => A=B=0
-        for sent in self.knowledge:
-            aux = []
-            if sent.count == 0:
-                for newsafe in sent.cells.copy():
-                    self.mark_safe(newsafe)
-                    aux.append(newsafe)
-                self.knowledge.remove(sent)
-#                print(f'{aux} safe cells added.')
-        # mark any additional cells as mines
-        #{A,B,C}=3 => A=B=C=1
-            elif sent.count == len(sent.cells):
-                aux = []
-                for newmine in sent.cells.copy():
-                    self.mark_mine(newmine)
-                    aux.append(newmine)
-                self.knowledge.remove(sent)
-#                print(f'{aux} mine cells added.')
-
-        # removing empty knowledge    
-        for sent in self.knowledge:
-            if len(sent.cells) == 0:
-                self.knowledge.remove(sent)
-
-        # add any new sentences from inference to the AI's knowledge base
-        # {A,B,C,D,E}=3 and {A,B,C}=1 => {D,E}=2
-        for sent0 in self.knowledge:
-            for sent1 in self.knowledge:
-                 if (sent0.cells < sent1.cells):
- #                   print(f'getting infered knowledge from {sent0.cells} = {sent0.count} and {sent1.cells} = {sent1.count}\n')
-                    self.knowledge.append(Sentence(sent1.cells.difference(sent0.cells),sent1.count-sent0.count))
-                    self.knowledge.remove(sent1)
- #                   print(f'infered knowledge added:{self.knowledge[-1].cells} = {self.knowledge[-1].count}. Removing {sent1.cells} = {sent1.count}')
+        neighbors = self._neighbors[cell] - self.safes
+        # remove known mines from neighbors
+        mine_overlap = neighbors & self.mines
+        neighbors -= mine_overlap
+        count -= len(mine_overlap)
+        # identical sentences are only stored once
+        if neighbors and neighbors not in self._knowledge:
+            self._knowledge[neighbors] = count
+
+        # Repeat until no new safes, mines or sentences can be concluded
+        while True:
+
+            # mark any additional cells as safe
+            # {A,B}=0 => A=B=0
+            # mark any additional cells as mines
+            # {A,B,C}=3 => A=B=C=1
+            newsafes = set()
+            newmines = set()
+            for cells, sent_count in self._knowledge.items():
+                if sent_count == 0:
+                    newsafes |= cells
+                elif sent_count == len(cells):
+                    newmines |= cells
+            # marking drops the sentences that become empty
+            for newsafe in newsafes:
+                self.mark_safe(newsafe)
+            for newmine in newmines:
+                self.mark_mine(newmine)
+
+            # add any new sentences from inference to the AI's knowledge base
+            # {A,B,C,D,E}=3 and {A,B,C}=1 => {D,E}=2
+            # Sorting by size means only earlier sentences can be proper subsets
+            snap = sorted(self._knowledge.items(), key=lambda item: len(item[0]))
+            knowledge = {}
+            for k in range(len(snap)):
+                cells1, count1 = snap[k]
+                for m in range(k):
+                    cells0, count0 = snap[m]
+                    if len(cells0) >= len(cells1):
+                        break
+                    if cells0 < cells1:
+                        cells1 = cells1 - cells0
+                        count1 -= count0
+                        break
+                knowledge.setdefault(cells1, count1)
+
+            if not newsafes and not newmines and knowledge == self._knowledge:
+                break
+            self._knowledge = knowledge
 
     def make_safe_move(self):
         """
@@ -304,9 +358,7 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        if len(self.safes)-len(self.moves_made) > 0:
-            return self.safes.difference(self.moves_made).pop()
-            #return auxset.pop()
+        return next(iter(self._pending_safes), None)
 
     def make_random_move(self):
         """
@@ -315,9 +367,6 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        if len(self.safes)-len(self.moves_made) < 1:
-            auxcell = (random.randint(0,self.width-1),random.randint(0,self.height-1))
-            # while (random move is not a safe or a mine) and (there are unchecked squares)
-            while (auxcell not in self.moves_made.union(self.mines)) and (len(self.safes)+len(self.mines)<(self.height-1)*(self.width-1)):
-                return auxcell
-
+        if not self._unchecked:
+            return None
+        return random.choice(tuple(self._unchecked))
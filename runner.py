@@ -1,11 +1,10 @@
 import pygame
 import sys
-import time
 
 from minesweeper import Minesweeper, MinesweeperAI
 
-HEIGHT = 8
-WIDTH = 8
+HEIGHT = 32
+WIDTH = 32
 MINES = 200
 
 # Colors
@@ -25,6 +24,10 @@ smallFont = pygame.font.Font(OPEN_SANS, 20)
 mediumFont = pygame.font.Font(OPEN_SANS, 28)
 largeFont = pygame.font.Font(OPEN_SANS, 40)
 
+# Pre-render the numbers shown on revealed cells
+numberFont = tinyFont if HEIGHT > 16 else smallFont
+numbers = [numberFont.render(str(n), True, BLACK) for n in range(9)]
+
 # Compute board size
 BOARD_PADDING = 20
 board_width = ((2 / 3) * width) - (BOARD_PADDING * 2)
@@ -32,6 +35,27 @@ board_height = height - (BOARD_PADDING * 2)
 cell_size = int(min(board_width / WIDTH, board_height / HEIGHT))
 board_origin = (BOARD_PADDING, BOARD_PADDING)
 
+# Cell rectangles never move, so build them once
+cells = [
+    [
+        pygame.Rect(
+            board_origin[0] + j * cell_size,
+            board_origin[1] + i * cell_size,
+            cell_size, cell_size
+        )
+        for j in range(WIDTH)
+    ]
+    for i in range(HEIGHT)
+]
+
+# Draw the empty grid once onto a background surface
+board_bg = pygame.Surface((WIDTH * cell_size, HEIGHT * cell_size))
+for i in range(HEIGHT):
+    for j in range(WIDTH):
+        rect = pygame.Rect(j * cell_size, i * cell_size, cell_size, cell_size)
+        pygame.draw.rect(board_bg, GRAY, rect)
+        pygame.draw.rect(board_bg, WHITE, rect, 3)
+
 # Add images
 flag = pygame.image.load("assets/images/flag.png")
 flag = pygame.transform.scale(flag, (cell_size, cell_size))
@@ -42,11 +66,21 @@ mine = pygame.transform.scale(mine, (cell_size, cell_size))
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
 ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
 
-# Keep track of revealed cells, flagged cells, and if a mine was hit
+# Keep track of revealed cells and if a mine was hit
 revealed = set()
-flags = set()
 lost = False
 
+# Buttons never move, so build their rectangles once
+playButton = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
+aiButton = pygame.Rect(
+    (2 / 3) * width + BOARD_PADDING, (1 / 3) * height - 50,
+    (width / 3) - BOARD_PADDING * 2, 50
+)
+resetButton = pygame.Rect(
+    (2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 20,
+    (width / 3) - BOARD_PADDING * 2, 50
+)
+
 # Show instructions initially
 instructions = True
 key4ai2move = 0
@@ -56,7 +90,14 @@ print('Welcome to Minesweeper!')
 print('This version is happy to welcome you with a 32x32 board and 200 mines.')
 print('printing unneccessary stuff')
 
+# Only redraw when something changed, and throttle repeated input
+clock = pygame.time.Clock()
+dirty = True
+INPUT_DELAY = 200
+next_input = 0
+
 while True:
+    clock.tick(30)
 
     # Check if game quit
     for event in pygame.event.get():
@@ -67,116 +108,105 @@ while True:
                 key4ai2move = 1
             elif event.key == pygame.K_g:
                 key4ai2go_on = 1
-
-    screen.fill(BLACK)
+        if event.type != pygame.MOUSEMOTION:
+            dirty = True
 
     # Show game instructions
     if instructions:
 
-        # Title
-        title = largeFont.render("Play Minesweeper", True, WHITE)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
-
-        # Rules
-        rules = [
-            "Click a cell to reveal it.",
-            "Right-click a cell to mark it as a mine.",
-            "Mark all mines successfully to win!"
-        ]
-        for i, rule in enumerate(rules):
-            if HEIGHT > 16:
-                line = tinyFont.render(rule, True, WHITE)   
-            else:
-                line = smallFont.render(rule, True, WHITE)
-            lineRect = line.get_rect()
-            lineRect.center = ((width / 2), 150 + 30 * i)
-            screen.blit(line, lineRect)
-
-        # Play game button
-        buttonRect = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
-        buttonText = mediumFont.render("Play Game", True, BLACK)
-        buttonTextRect = buttonText.get_rect()
-        buttonTextRect.center = buttonRect.center
-        pygame.draw.rect(screen, WHITE, buttonRect)
-        screen.blit(buttonText, buttonTextRect)
+        if dirty:
+            screen.fill(BLACK)
+
+            # Title
+            title = largeFont.render("Play Minesweeper", True, WHITE)
+            titleRect = title.get_rect()
+            titleRect.center = ((width / 2), 50)
+            screen.blit(title, titleRect)
+
+            # Rules
+            rules = [
+                "Click a cell to reveal it.",
+                "Right-click a cell to mark it as a mine.",
+                "Mark all mines successfully to win!"
+            ]
+            for i, rule in enumerate(rules):
+                if HEIGHT > 16:
+                    line = tinyFont.render(rule, True, WHITE)
+                else:
+                    line = smallFont.render(rule, True, WHITE)
+                lineRect = line.get_rect()
+                lineRect.center = ((width / 2), 150 + 30 * i)
+                screen.blit(line, lineRect)
+
+            # Play game button
+            buttonText = mediumFont.render("Play Game", True, BLACK)
+            buttonTextRect = buttonText.get_rect()
+            buttonTextRect.center = playButton.center
+            pygame.draw.rect(screen, WHITE, playButton)
+            screen.blit(buttonText, buttonTextRect)
+
+            pygame.display.flip()
+            dirty = False
 
         # Check if play button clicked
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1:
             mouse = pygame.mouse.get_pos()
-            if buttonRect.collidepoint(mouse):
+            if playButton.collidepoint(mouse):
                 instructions = False
-                #time.sleep(0.3)
+                next_input = pygame.time.get_ticks() + INPUT_DELAY
+                dirty = True
 
-        pygame.display.flip()
         continue
 
-    # Draw board
-    cells = []
-    for i in range(HEIGHT):
-        row = []
-        for j in range(WIDTH):
-
-            # Draw rectangle for cell
-            rect = pygame.Rect(
-                board_origin[0] + j * cell_size,
-                board_origin[1] + i * cell_size,
-                cell_size, cell_size
-            )
-            pygame.draw.rect(screen, GRAY, rect)
-            pygame.draw.rect(screen, WHITE, rect, 3)
-
-            # Add a mine, flag, or number if needed
-            if game.is_mine((i, j)) and lost:
-                screen.blit(mine, rect)
-            elif (i, j) in flags:
-                screen.blit(flag, rect)
-            elif (i, j) in revealed:
-                if HEIGHT>16:
-                    neighbors = tinyFont.render(
-                    str(game.nearby_mines((i, j))),
-                    True, BLACK)
-                else:
-                    neighbors = smallFont.render(
-                    str(game.nearby_mines((i, j))),
-                    True, BLACK)
-                neighborsTextRect = neighbors.get_rect()
-                neighborsTextRect.center = rect.center
-                screen.blit(neighbors, neighborsTextRect)
-
-            row.append(rect)
-        cells.append(row)
-
-    # AI Move button
-    aiButton = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, (1 / 3) * height - 50,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    buttonText = mediumFont.render("AI Move", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = aiButton.center
-    pygame.draw.rect(screen, WHITE, aiButton)
-    screen.blit(buttonText, buttonRect)
-
-    # Reset button
-    resetButton = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 20,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    buttonText = mediumFont.render("Reset", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = resetButton.center
-    pygame.draw.rect(screen, WHITE, resetButton)
-    screen.blit(buttonText, buttonRect)
-
-    # Display text
-    text = "Lost" if lost else "Won" if game.mines == flags else ""
-    text = mediumFont.render(text, True, WHITE)
-    textRect = text.get_rect()
-    textRect.center = ((5 / 6) * width, (2 / 3) * height)
-    screen.blit(text, textRect)
+    if dirty:
+        screen.fill(BLACK)
+
+        # Draw board
+        screen.blit(board_bg, board_origin)
+
+        # Add a mine, flag, or number where needed
+        flags = game.mines_found
+        for i, j in revealed - flags:
+            rect = cells[i][j]
+            neighbors = numbers[game.nearby_mines((i, j))]
+            neighborsTextRect = neighbors.get_rect()
+            neighborsTextRect.center = rect.center
+            screen.blit(neighbors, neighborsTextRect)
+        for i, j in flags:
+            if not (lost and game.is_mine((i, j))):
+                screen.blit(flag, cells[i][j])
+        if lost:
+            for i, j in game.mines:
+                screen.blit(mine, cells[i][j])
+
+        # AI Move button
+        buttonText = mediumFont.render("AI Move", True, BLACK)
+        buttonRect = buttonText.get_rect()
+        buttonRect.center = aiButton.center
+        pygame.draw.rect(screen, WHITE, aiButton)
+        screen.blit(buttonText, buttonRect)
+
+        # Reset button
+        buttonText = mediumFont.render("Reset", True, BLACK)
+        buttonRect = buttonText.get_rect()
+        buttonRect.center = resetButton.center
+        pygame.draw.rect(screen, WHITE, resetButton)
+        screen.blit(buttonText, buttonRect)
+
+        # Display text
+        text = "Lost" if lost else "Won" if game.won() else ""
+        text = mediumFont.render(text, True, WHITE)
+        textRect = text.get_rect()
+        textRect.center = ((5 / 6) * width, (2 / 3) * height)
+        screen.blit(text, textRect)
+
+        pygame.display.flip()
+        dirty = False
+
+    # Ignore held buttons and auto-play until the input delay has passed
+    if pygame.time.get_ticks() < next_input:
+        continue
 
     move = None
 
@@ -188,15 +218,16 @@ while True:
 
     # Check for a right-click to toggle flagging
     if (right == 1 and not lost):
-        mouse = pygame.mouse.get_pos()
-        for i in range(HEIGHT):
-            for j in range(WIDTH):
-                if cells[i][j].collidepoint(mouse) and (i, j) not in revealed:
-                    if (i, j) in flags:
-                        flags.remove((i, j))
-                    else:
-                        flags.add((i, j))
-                    time.sleep(0.2)
+        mx, my = pygame.mouse.get_pos()
+        j = (mx - board_origin[0]) // cell_size
+        i = (my - board_origin[1]) // cell_size
+        if 0 <= i < HEIGHT and 0 <= j < WIDTH and (i, j) not in revealed:
+            if game.is_found((i, j)):
+                game.unmark_found((i, j))
+            else:
+                game.mark_found((i, j))
+            next_input = pygame.time.get_ticks() + INPUT_DELAY
+            dirty = True
 
     elif (left == 1) or (key4ai2move == 1) or (key4ai2go_on == 1):
         mouse = pygame.mouse.get_pos()
@@ -208,34 +239,40 @@ while True:
             if move is None:
                 move = ai.make_random_move()
                 if move is None:
-                    flags = ai.mines.copy()
+                    for cell in game.mines_found - ai.mines:
+                        game.unmark_found(cell)
+                    for cell in ai.mines:
+                        game.mark_found(cell)
                     print("No moves left to make.")
                     key4ai2go_on = 0
                 else:
                     print(f"No known safe moves, AI making random move: {move}")
             else:
                 print(f"AI making safe move: {move}")
-            time.sleep(0.2)
+            next_input = pygame.time.get_ticks() + INPUT_DELAY
+            dirty = True
         # Reset game state
         elif resetButton.collidepoint(mouse):
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
             ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
             revealed = set()
-            flags = set()
             lost = False
             key4ai2go_on = 0
+            dirty = True
             continue
         # User-made move
         elif not lost:
-            for i in range(HEIGHT):
-                for j in range(WIDTH):
-                    if (cells[i][j].collidepoint(mouse)
-                            and (i, j) not in flags
-                            and (i, j) not in revealed):
-                        move = (i, j)
+            mx, my = mouse
+            j = (mx - board_origin[0]) // cell_size
+            i = (my - board_origin[1]) // cell_size
+            if (0 <= i < HEIGHT and 0 <= j < WIDTH
+                    and not game.is_found((i, j))
+                    and (i, j) not in revealed):
+                move = (i, j)
 
     # Make move and update AI knowledge
     if move:
+        dirty = True
         if game.is_mine(move):
             lost = True
         else:
@@ -252,10 +289,8 @@ while True:
  #           print(f'safe cells found until now: {ai.safes}')
  #           print(f'mines found until now: {ai.mines}\n')
 
-        # Mark mines found by the AI
-    while len(ai.mines) > len(flags):
-        for mines in ai.mines.difference(flags):
-            flags.add(mines)
-            time.sleep(0.2)
-
-    pygame.display.flip()
+    # Mark mines found by the AI
+    if len(ai.mines) > game.found_count():
+        for cell in ai.mines:
+            game.mark_found(cell)
+        dirty = True